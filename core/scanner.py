@@ -2,98 +2,276 @@
 import asyncio
 import aiohttp
 import csv
-from typing import Dict, Any, List
-from tqdm.asyncio import tqdm
+import io
+from typing import Callable, Dict, Any, IO, List, Optional, Tuple
+from yarl import URL
 import logging
+import sys
+import time
 
 log = logging.getLogger("rich")
 
+# Quantidade máxima do corpo lida quando há busca por palavras-chave
+MAX_BODY_BYTES = 65536
+
+# Intervalo, em segundos, entre as mensagens de progresso
+PROGRESS_INTERVAL = 5.0
+
+# No HEAD o Content-Length precisa ser o do corpo sem compressão
+HEAD_HEADERS = {'Accept-Encoding': 'identity'}
+
 class URLScanner:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.base_url = config['target']['base_url']
         self.wordlist_path = config['target']['wordlist_path']
         self.output_file = config['reporting']['output_file']
-        self.results = []
+        self._rich_output = config['reporting'].get('rich_output', False)
+        self._show_errors = config['reporting'].get('show_errors', False)
+        self.results: List[Tuple[str, int, int]] = []
+        self.tested = 0
+        self.errors = 0
+
+        # Constantes por execução, montadas uma única vez
+        self._headers = {'User-Agent': config['scanner']['user_agent']}
+        self._timeout = aiohttp.ClientTimeout(total=config['scanner']['timeout'])
+        self._base_slash = self.base_url.rstrip('/') + '/'
+        # Opcional: o conjunto de palavras já vistas cresce com a wordlist
+        self._dedup = config['scanner'].get('dedup_wordlist', False)
+
+        # Listas deixadas em branco no YAML chegam como None
+        filters = config['filters']
+        # Sem palavras-chave não há por que guardar o corpo da resposta
+        self._needs_body = bool(filters['exclude_keywords'] or ())
+        self._exclude_kw_bytes = tuple(k.encode('utf-8').lower() for k in filters['exclude_keywords'] or ())
+        # Se os filtros só olham status e tamanho, um HEAD basta
+        self._method = 'GET' if self._needs_body else 'HEAD'
+        # Com min_content_length negativo o tamanho nunca muda o veredito
+        self._length_matters = int(filters['min_content_length'] or 0) >= 0
+        self._status_ok, self._is_valid_result = self._build_filter()
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: str) -> Optional[Tuple[str, int, int]]:
+        """Realiza uma única requisição HTTP e devolve o resultado se ele passar nos filtros."""
+        status = None
+        content_length = 0
+        content = b''
+        try:
+            if self._method == 'HEAD':
+                async with session.head(url, allow_redirects=False, headers=HEAD_HEADERS) as response:
+                    # Servidores que não aceitam HEAD caem no GET
+                    if response.status not in (405, 501):
+                        # Status reprovado dispensa o GET, seja qual for o tamanho
+                        if not self._status_ok(response.status):
+                            return None
+                        header_length = response.headers.get('Content-Length', '')
+                        if not self._length_matters:
+                            status = response.status
+                            content_length = int(header_length) if header_length.isdigit() else 0
+                        # Sem tamanho confiável (ausente ou comprimido), o GET mede o corpo
+                        elif header_length.isdigit() and 'Content-Encoding' not in response.headers:
+                            status, content_length = response.status, int(header_length)
 
-    async def _fetch(self, session: aiohttp.ClientSession, url: str, semaphore: asyncio.Semaphore):
-        """Realiza uma única requisição HTTP de forma assíncrona."""
-        headers = {'User-Agent': self.config['scanner']['user_agent']}
-        async with semaphore:
+            if status is None:
+                async with session.get(url, allow_redirects=False) as response:
+                    status = response.status
+                    if self._needs_body:
+                        chunks = []
+                        async for chunk in response.content.iter_chunked(16384):
+                            chunks.append(chunk)
+                            content_length += len(chunk)
+                            if content_length >= MAX_BODY_BYTES:
+                                # O restante do corpo não interessa à busca de keywords
+                                response.close()
+                                # O header só vale para corpos sem compressão; do contrário
+                                # fica o total lido, que é um limite inferior do tamanho real
+                                header_length = response.headers.get('Content-Length', '')
+                                if header_length.isdigit() and 'Content-Encoding' not in response.headers:
+                                    content_length = int(header_length)
+                                break
+                        content = b''.join(chunks).lower() # para busca de keywords
+                    else:
+                        async for chunk in response.content.iter_chunked(65536):
+                            content_length += len(chunk)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            # Timeouts e erros de conexão nunca passam nos filtros, mas são contados
+            self.errors += 1
+            if self._show_errors:
+                sys.stdout.write(f"[!] Erro de conexão: {url}\n")
+            return None
+
+        # O corpo é descartado aqui mesmo; só o resumo sai da tarefa
+        if not self._is_valid_result(status, content_length, content):
+            return None
+        return (url, status, content_length)
+
+    async def _produce(self, wordlist: IO[bytes], queue: asyncio.Queue, concurrency: int):
+        """Alimenta a fila com as URLs da wordlist e um sentinela por worker."""
+        seen = set() if self._dedup else None
+        duplicates = 0
+        undecodable = 0
+        for line in wordlist:
+            word = line.strip()
+            if not word:
+                continue
+            if seen is not None:
+                if word in seen:
+                    duplicates += 1
+                    continue
+                seen.add(word)
+            # Decodifica só a palavra já limpa, e apenas uma vez; linhas que
+            # não são UTF-8 válido são puladas em vez de virarem outro caminho
             try:
-                async with session.get(url, headers=headers, timeout=self.config['scanner']['timeout'], allow_redirects=False) as response:
-                    content = await response.read()
-                    return {
-                        "url": url,
-                        "status": response.status,
-                        "content_length": len(content),
-                        "content": content.lower() # para busca de keywords
-                    }
-            except asyncio.TimeoutError:
-                return {"url": url, "status": "TIMEOUT", "content_length": 0}
-            except aiohttp.ClientError:
-                return {"url": url, "status": "ERROR", "content_length": 0}
-
-    def _is_valid_result(self, result: Dict[str, Any]) -> bool:
-        """Aplica as regras de filtro do arquivo de configuração."""
-        status = result['status']
-        if not isinstance(status, int):
-            return False
+                path = word.decode('utf-8')
+            except UnicodeDecodeError:
+                undecodable += 1
+                continue
+            await queue.put(self._base_slash + path)
+        if duplicates:
+            log.info(f"{duplicates} entradas duplicadas ignoradas na wordlist.")
+        if undecodable:
+            log.warning(f"{undecodable} entradas da wordlist ignoradas por não serem UTF-8 válido.")
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def _worker(self, session: aiohttp.ClientSession, queue: asyncio.Queue):
+        """Consome URLs da fila até receber o sentinela (None)."""
+        while True:
+            url = await queue.get()
+            if url is None:
+                break
+            result = await self._fetch(session, url)
+            self.tested += 1
+            if result is not None:
+                url, status, content_length = result
+                if self._rich_output:
+                    log.info(f"[+] Encontrado: {url} [Status: {status}, Tamanho: {content_length}]")
+                else:
+                    # Escrita direta: sem o parsing de markup e o lock do Rich a cada achado
+                    sys.stdout.write(f"[+] {url} {status} {content_length}\n")
+                self.results.append(result)
+
+    async def _report_progress(self, start: float):
+        """Registra periodicamente quantas URLs já foram testadas."""
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            elapsed = time.monotonic() - start
+            log.info(f"Progresso: {self.tested} URLs testadas ({self.tested / elapsed:.0f} URLs/s)")
+
+    def _make_resolver(self) -> aiohttp.abc.AbstractResolver:
+        """Usa o aiodns (c-ares) quando disponível, evitando o getaddrinfo em threads."""
+        try:
+            return aiohttp.AsyncResolver()
+        except RuntimeError:
+            log.warning("aiodns não instalado; usando o resolvedor DNS padrão.")
+            return aiohttp.ThreadedResolver()
 
+    async def _prefetch_dns(self, connector: aiohttp.TCPConnector):
+        """Resolve o host alvo uma vez, aquecendo o cache de DNS do connector."""
+        target = URL(self.base_url)
+        if not target.host:
+            return
+        try:
+            await connector._resolve_host(target.host, target.port)
+        except OSError as e:
+            log.warning(f"Falha ao pré-resolver DNS de '{target.host}': {e}")
+
+    def _build_filter(self) -> Tuple[Callable[[int], bool], Callable[[int, int, bytes], bool]]:
+        """Gera os filtros (só status, e completo) com as regras da configuração embutidas como literais."""
         filters = self.config['filters']
-        
-        if filters['include_status_codes'] and status not in filters['include_status_codes']:
-            return False
-        
-        if status in filters['exclude_status_codes']:
-            return False
-            
-        if result['content_length'] <= filters['min_content_length']:
-            return False
-            
-        for keyword in filters['exclude_keywords']:
-            if keyword.encode('utf-8').lower() in result['content']:
-                return False
-                
-        return True
+        include = sorted({int(code) for code in filters['include_status_codes'] or ()})
+        exclude = sorted({int(code) for code in filters['exclude_status_codes'] or ()})
+
+        # "x in {...}" com literais vira uma constante frozenset no bytecode
+        status_checks = []
+        if include:
+            status_checks.append(f"    if status not in {{{', '.join(map(str, include))}}}: return False")
+        if exclude:
+            status_checks.append(f"    if status in {{{', '.join(map(str, exclude))}}}: return False")
+
+        lines = ["def _status_ok(status):", *status_checks, "    return True", ""]
+        lines.append("def _is_valid_result(status, content_length, content):")
+        lines.extend(status_checks)
+        lines.append(f"    if content_length <= {int(filters['min_content_length'] or 0)}: return False")
+        for keyword in self._exclude_kw_bytes:
+            lines.append(f"    if {keyword!r} in content: return False")
+        lines.append("    return True")
+
+        namespace: Dict[str, Any] = {}
+        exec("\n".join(lines), namespace)
+        return namespace['_status_ok'], namespace['_is_valid_result']
 
     def _save_report(self):
         """Salva os resultados encontrados em um arquivo CSV."""
         if not self.results:
             log.info("Nenhum resultado válido encontrado para salvar.")
             return
+        if not self.output_file:
+            return
 
         log.info(f"Salvando {len(self.results)} resultados em '{self.output_file}'...")
+        # Monta o CSV em memória e grava tudo com uma única escrita
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["URL", "Status Code", "Content Length"])
+        writer.writerows(self.results)
         with open(self.output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(["URL", "Status Code", "Content Length"])
-            for result in self.results:
-                writer.writerow([result['url'], result['status'], result['content_length']])
+            f.write(buffer.getvalue())
         log.info("Relatório salvo com sucesso!")
 
     async def run(self):
         """Orquestra todo o processo de escaneamento."""
         try:
-            with open(self.wordlist_path, 'r') as f:
-                words = [line.strip() for line in f if line.strip()]
+            wordlist = open(self.wordlist_path, 'rb')
         except FileNotFoundError:
             log.error(f"Wordlist não encontrada em '{self.wordlist_path}'")
             return
 
-        semaphore = asyncio.Semaphore(self.config['scanner']['concurrency'])
-        
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for word in words:
-                url = f"{self.base_url}/{word}"
-                tasks.append(self._fetch(session, url, semaphore))
-
-            log.info(f"Iniciando scan em '{self.base_url}' com {len(tasks)} URLs...")
-            
-            for f in tqdm.as_completed(tasks, total=len(tasks), desc="Escaneando"):
-                result = await f
-                if self._is_valid_result(result):
-                    log.info(f"[+] Encontrado: {result['url']} [Status: {result['status']}, Tamanho: {result['content_length']}]")
-                    self.results.append(result)
+        concurrency = self.config['scanner']['concurrency']
+        # O connector não é dono de um resolver recebido pronto; fechamos no fim
+        resolver = self._make_resolver()
+        # O pool de conexões do connector substitui o semáforo: limita as
+        # requisições simultâneas e reaproveita conexões keep-alive no host.
+        connector = aiohttp.TCPConnector(
+            limit=concurrency,
+            limit_per_host=concurrency,
+            keepalive_timeout=30,
+            resolver=resolver,
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+        )
+
+        # Fila limitada: a wordlist é lida conforme os workers consomem,
+        # sem carregar o arquivo inteiro em memória.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+
+        with wordlist:
+            try:
+                async with aiohttp.ClientSession(connector=connector, timeout=self._timeout, headers=self._headers) as session:
+                    await self._prefetch_dns(connector)
+                    log.info(f"Iniciando scan em '{self.base_url}' com a wordlist '{self.wordlist_path}'...")
+
+                    start = time.monotonic()
+                    progress = asyncio.create_task(self._report_progress(start))
+                    tasks = [asyncio.create_task(self._produce(wordlist, queue, concurrency))]
+                    tasks += [
+                        asyncio.create_task(self._worker(session, queue))
+                        for _ in range(concurrency)
+                    ]
+                    try:
+                        await asyncio.gather(*tasks)
+                    except BaseException:
+                        # Uma falha em qualquer tarefa derruba as demais; sem isso o
+                        # produtor ficaria preso na fila cheia se os workers morressem
+                        for task in tasks:
+                            task.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+                        raise
+                    finally:
+                        progress.cancel()
+            finally:
+                await resolver.close()
+
+        log.info(f"Scan concluído: {self.tested} URLs testadas, {self.errors} erros de conexão, em {time.monotonic() - start:.2f}s.")
 
         self._save_report()
\ No newline at end of file
@@ -1,154 +1,119 @@
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import os
 import sys
-from typing import List, Tuple
-from urllib.parse import urljoin
 import time
+from typing import Any, Dict
+
+from core.scanner import URLScanner
+from utils.logger import setup_logger
+
+try:
+    import uvloop
+except ImportError:  # uvloop não tem suporte no Windows
+    uvloop = None
+
+# uvloop.run() só existe a partir da 0.18; versões antigas usam o asyncio padrão
+if uvloop is not None and not hasattr(uvloop, 'run'):
+    uvloop = None
 
 
 class URLTester:
-    """Classe para testar URLs com suporte a threading e controle de taxa"""
+    """Interface de linha de comando legada, delegando ao URLScanner assíncrono"""
     
-    def __init__(self, base_url: str, timeout: int = 5, max_workers: int = 10):
+    def __init__(self, base_url: str, timeout: int = 5, max_workers: int = 10, output_file: str = None,
+                 rich_output: bool = False, show_errors: bool = False, dedup: bool = False):
         """
         Inicializa o testador de URLs
         
         Args:
             base_url: A URL base do alvo
             timeout: Timeout para cada requisição em segundos
-            max_workers: Número máximo de threads paralelas
+            max_workers: Número máximo de requisições simultâneas
+            output_file: Arquivo CSV para o relatório (opcional)
+            rich_output: Se deve exibir cada achado formatado pelo Rich
+            show_errors: Se deve mostrar erros de conexão
+            dedup: Se deve ignorar entradas repetidas da wordlist
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
         self.max_workers = max_workers
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        
-        self.found_urls = []
-        self.tested_count = 0
-        self.error_count = 0
+        self.output_file = output_file
+        self.rich_output = rich_output
+        self.show_errors = show_errors
+        self.dedup = dedup
     
-    def load_wordlist(self, wordlist_path: str) -> List[str]:
-        """
-        Carrega a wordlist do arquivo
-        
-        Args:
-            wordlist_path: Caminho para o arquivo de wordlist
-            
-        Returns:
-            Lista de palavras limpas
-        """
-        try:
-            with open(wordlist_path, 'r', encoding='utf-8', errors='ignore') as f:
-                words = [line.strip() for line in f if line.strip()]
-            print(f"[*] Wordlist carregada: {len(words)} entradas")
-            return words
-        except FileNotFoundError:
-            print(f"[!] Erro: O arquivo '{wordlist_path}' não foi encontrado")
-            sys.exit(1)
-        except Exception as e:
-            print(f"[!] Erro ao ler wordlist: {e}")
-            sys.exit(1)
+    def _build_config(self, wordlist_path: str) -> Dict[str, Any]:
+        """Monta uma configuração no mesmo formato do config.yaml"""
+        return {
+            'target': {
+                'base_url': self.base_url,
+                'wordlist_path': wordlist_path,
+            },
+            'scanner': {
+                'concurrency': self.max_workers,
+                'timeout': self.timeout,
+                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'dedup_wordlist': self.dedup,
+            },
+            'filters': {
+                'include_status_codes': [],
+                'exclude_status_codes': [404],
+                # Aceita também respostas vazias (ex.: redirecionamentos)
+                'min_content_length': -1,
+                'exclude_keywords': [],
+            },
+            'reporting': {
+                'output_file': self.output_file,
+                'rich_output': self.rich_output,
+                'show_errors': self.show_errors,
+            },
+        }
     
-    def test_single_url(self, word: str) -> Tuple[str, int, bool]:
+    def test_urls(self, wordlist_path: str) -> None:
         """
-        Testa uma única URL
-        
-        Args:
-            word: Palavra para testar
-            
-        Returns:
-            Tupla (url, status_code, sucesso)
-        """
-        full_url = urljoin(self.base_url + '/', word)
-        
-        try:
-            response = self.session.get(
-                full_url,
-                timeout=self.timeout,
-                allow_redirects=False
-            )
-            return (full_url, response.status_code, True)
-        except requests.exceptions.Timeout:
-            return (full_url, 0, False)
-        except requests.exceptions.RequestException:
-            return (full_url, 0, False)
-    
-    def test_urls(self, wordlist_path: str, show_errors: bool = False) -> None:
-        """
-        Testa URLs usando threading
+        Testa as URLs da wordlist com o scanner assíncrono
         
         Args:
             wordlist_path: Caminho para o arquivo de wordlist
-            show_errors: Se deve mostrar erros de conexão
         """
         print("=" * 60)
         print(f"[*] Alvo: {self.base_url}")
-        print(f"[*] Threads: {self.max_workers}")
+        print(f"[*] Conexões simultâneas: {self.max_workers}")
         print(f"[*] Timeout: {self.timeout}s")
         print("=" * 60)
         
-        words = self.load_wordlist(wordlist_path)
-        start_time = time.time()
+        # O scanner só registra a ausência da wordlist; aqui ela encerra a CLI com erro
+        if not os.path.isfile(wordlist_path):
+            print(f"[!] Erro: O arquivo '{wordlist_path}' não foi encontrado")
+            sys.exit(1)
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_word = {
-                executor.submit(self.test_single_url, word): word 
-                for word in words
-            }
-            
-            for future in as_completed(future_to_word):
-                self.tested_count += 1
-                full_url, status_code, success = future.result()
-                
-                if success and status_code != 404:
-                    status_color = self._get_status_color(status_code)
-                    print(f"[+] {status_color}[{status_code}]{self._reset_color()} {full_url}")
-                    self.found_urls.append((full_url, status_code))
-                elif not success:
-                    self.error_count += 1
-                    if show_errors:
-                        print(f"[!] Erro de conexão: {full_url}")
-                
-                # Progress indicator
-                if self.tested_count % 100 == 0:
-                    print(f"[*] Progresso: {self.tested_count}/{len(words)} testadas", end='\r')
+        start_time = time.time()
+        scanner = URLScanner(self._build_config(wordlist_path))
+        # O loop do uvloop (libuv) é bem mais rápido que o padrão do asyncio
+        if uvloop is not None:
+            uvloop.run(scanner.run())
+        else:
+            asyncio.run(scanner.run())
         
         elapsed_time = time.time() - start_time
-        self._print_summary(len(words), elapsed_time)
-    
-    def _get_status_color(self, status_code: int) -> str:
-        """Retorna código de cor ANSI baseado no status HTTP"""
-        if 200 <= status_code < 300:
-            return '\033[92m'  # Verde
-        elif 300 <= status_code < 400:
-            return '\033[93m'  # Amarelo
-        elif 400 <= status_code < 500:
-            return '\033[91m'  # Vermelho
-        else:
-            return '\033[94m'  # Azul
-    
-    def _reset_color(self) -> str:
-        """Reseta a cor do terminal"""
-        return '\033[0m'
+        self._print_summary(scanner, elapsed_time)
     
-    def _print_summary(self, total: int, elapsed: float) -> None:
+    def _print_summary(self, scanner: URLScanner, elapsed: float) -> None:
         """Imprime resumo dos resultados"""
         print("\n" + "=" * 60)
         print("[*] RESUMO")
         print("=" * 60)
-        print(f"[*] URLs testadas: {total}")
-        print(f"[+] URLs encontradas: {len(self.found_urls)}")
-        print(f"[!] Erros de conexão: {self.error_count}")
+        print(f"[*] URLs testadas: {scanner.tested}")
+        print(f"[+] URLs encontradas: {len(scanner.results)}")
+        print(f"[!] Erros de conexão: {scanner.errors}")
         print(f"[*] Tempo decorrido: {elapsed:.2f}s")
-        print(f"[*] Requisições/segundo: {total/elapsed:.2f}")
+        if elapsed > 0:
+            print(f"[*] Requisições/segundo: {scanner.tested / elapsed:.2f}")
         print("=" * 60)
         
-        if self.found_urls:
+        if scanner.results:
             print("\n[*] URLs encontradas:")
-            for url, status in sorted(self.found_urls, key=lambda x: x[1]):
+            for url, status, _ in sorted(scanner.results, key=lambda x: x[1]):
                 print(f"  [{status}] {url}")
 
 
@@ -158,8 +123,11 @@ def main():
         print("Uso: python url_tester.py <url_base> <wordlist> [opções]")
         print("\nOpções:")
         print("  --timeout <segundos>    Timeout por requisição (padrão: 5)")
-        print("  --threads <número>      Número de threads (padrão: 10)")
+        print("  --threads <número>      Número de requisições simultâneas (padrão: 10)")
+        print("  --output <arquivo>      Salva os resultados em CSV")
+        print("  --rich-output           Exibe os achados formatados pelo Rich")
         print("  --show-errors           Mostrar erros de conexão")
+        print("  --dedup                 Ignora entradas repetidas da wordlist (usa mais memória)")
         print("\nExemplo:")
         print("  python url_tester.py http://example.com wordlist.txt --threads 20")
         sys.exit(1)
@@ -170,7 +138,10 @@ def main():
     # Parse opções
     timeout = 5
     threads = 10
+    output_file = None
+    rich_output = False
     show_errors = False
+    dedup = False
     
     i = 3
     while i < len(sys.argv):
@@ -180,15 +151,28 @@ def main():
         elif sys.argv[i] == '--threads' and i + 1 < len(sys.argv):
             threads = int(sys.argv[i + 1])
             i += 2
+        elif sys.argv[i] == '--output' and i + 1 < len(sys.argv):
+            output_file = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] == '--rich-output':
+            rich_output = True
+            i += 1
         elif sys.argv[i] == '--show-errors':
             show_errors = True
             i += 1
+        elif sys.argv[i] == '--dedup':
+            dedup = True
+            i += 1
         else:
+            print(f"[!] Opção desconhecida ignorada: {sys.argv[i]}")
             i += 1
     
+    setup_logger()
     try:
-        tester = URLTester(target_url, timeout=timeout, max_workers=threads)
-        tester.test_urls(wordlist_file, show_errors=show_errors)
+        tester = URLTester(target_url, timeout=timeout, max_workers=threads,
+                           output_file=output_file, rich_output=rich_output,
+                           show_errors=show_errors, dedup=dedup)
+        tester.test_urls(wordlist_file)
     except KeyboardInterrupt:
         print("\n\n[!] Interrompido pelo usuário")
         sys.exit(0)
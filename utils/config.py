@@ -1,16 +1,23 @@
 import yaml
 from typing import Dict, Any
 
+try:
+    # Loader em C (libyaml), bem mais rápido que o SafeLoader em Python puro
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+class ConfigError(Exception):
+    """Erro ao carregar ou interpretar o arquivo de configuração."""
+
 def load_config(path: str = "config.yaml") -> Dict[str, Any]:
     """Carrega e valida o arquivo de configuração YAML."""
     try:
         with open(path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
         # Adicionar validações básicas aqui se necessário
         return config
-    except FileNotFoundError:
-        print(f"Erro: Arquivo de configuração '{path}' não encontrado.")
-        exit(1)
+    except FileNotFoundError as e:
+        raise ConfigError(f"Arquivo de configuração '{path}' não encontrado.") from e
     except yaml.YAMLError as e:
-        print(f"Erro ao analisar o arquivo YAML: {e}")
-        exit(1)
\ No newline at end of file
+        raise ConfigError(f"Erro ao analisar o arquivo YAML: {e}") from e
\ No newline at end of file